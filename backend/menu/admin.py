@@ -1,8 +1,9 @@
 from django.contrib import admin
+from django.db import transaction
 from django.db.models import QuerySet
 from django.http import HttpRequest
 from django.utils.html import format_html
-from .models import MenuItem, Order, Basket, Category, Tag
+from .models import MenuItem, Order, Basket, Category, Tag, invalidate_menu_cache
 from .forms import MenuItemForm
 
 
@@ -19,21 +20,25 @@ class ItemTagsInline(admin.TabularInline):
 @admin.action(description='Archive selected menu items')
 def mark_archived(modeladmin: admin.ModelAdmin, request: HttpRequest, queryset: QuerySet):
     queryset.update(archived=True)
+    transaction.on_commit(invalidate_menu_cache)
 
 
 @admin.action(description='Unarchived selected menu items')
 def remark_archived(modeladmin: admin.ModelAdmin, request: HttpRequest, queryset: QuerySet):
     queryset.update(archived=False)
+    transaction.on_commit(invalidate_menu_cache)
 
 
 @admin.action(description='Set discount 10 percent')
 def set_discount_10(modeladmin: admin.ModelAdmin, request: HttpRequest, queryset: QuerySet):
     queryset.update(discount=10)
+    transaction.on_commit(invalidate_menu_cache)
 
 
 @admin.action(description='Set discount 5 percent')
 def set_discount_5(modeladmin: admin.ModelAdmin, request: HttpRequest, queryset: QuerySet):
     queryset.update(discount=5)
+    transaction.on_commit(invalidate_menu_cache)
 
 
 @admin.register(MenuItem)
@@ -1,22 +1,46 @@
 import csv
 from django.core.management.base import BaseCommand
-from menu.models import Category, MenuItem
+from django.db import transaction
+from menu.models import Category, MenuItem, invalidate_menu_cache
 
 
 class Command(BaseCommand):
     help = 'Import menu items from CSV file'
 
     def handle(self, *args, **kwargs):
-        with open('/home/anton/Flask/Gico/Gico_menu_app/backend/menu.csv', newline='', encoding='utf-8-sig') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                category_name = row['category']
-                category, created = Category.objects.get_or_create(name=category_name)
+        with open('/home/anton/Flask/Gico/Gico_menu_app/backend/menu.csv', newline='', encoding='utf-8-sig',
+                  buffering=1 << 20) as csvfile:
+            reader = csv.reader(csvfile)
+            header = next(reader)
+            name_idx, description_idx, category_idx, price_idx = (
+                header.index(column) for column in ('ItemMenu', 'description', 'category', 'price')
+            )
+            rows = [
+                (row[name_idx], row[description_idx], row[category_idx], row[price_idx])
+                for row in reader if row
+            ]
 
-                MenuItem.objects.create(
-                    name=row['ItemMenu'],
-                    description=row['description'],
-                    price=row['price'],
-                    category=category
-                )
-                self.stdout.write(self.style.SUCCESS(f'Item {row["ItemMenu"]} added'))
+        category_names = {category_name for _, _, category_name, _ in rows}
+        with transaction.atomic():
+            # Category.name is not unique, so existing rows are matched by name rather than by conflict.
+            categories = {category.name: category for category in Category.objects.filter(name__in=category_names)}
+            new_categories = Category.objects.bulk_create(
+                [Category(name=name) for name in category_names if name not in categories]
+            )
+            categories.update({category.name: category for category in new_categories})
+
+            items = MenuItem.objects.bulk_create(
+                [
+                    MenuItem(
+                        name=name,
+                        description=description,
+                        price=price,
+                        category=categories[category_name],
+                    )
+                    for name, description, category_name, price in rows
+                ],
+                batch_size=1000,
+            )
+        # bulk_create sends no model signals, so the cached menu is invalidated explicitly.
+        invalidate_menu_cache()
+        self.stdout.write(self.style.SUCCESS(f'{len(items)} items added'))
@@ -0,0 +1,13 @@
+class RequestCacheMiddleware:
+    """
+    Attach request-scoped lookup caches to every request.
+
+    Attributes set on the request:
+    - _menu_items: MenuItem instances already loaded while handling the request, keyed by id.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._menu_items = {}
+        return self.get_response(request)
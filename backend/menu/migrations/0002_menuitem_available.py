@@ -8,10 +8,15 @@ class Migration(migrations.Migration):
         ("menu", "0001_initial"),
     ]
 
+    # 0001_initial already creates the column, so this only updates the migration state.
     operations = [
-        migrations.AddField(
-            model_name="menuitem",
-            name="available",
-            field=models.BooleanField(default=True),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name="menuitem",
+                    name="available",
+                    field=models.BooleanField(default=True),
+                ),
+            ],
         ),
     ]
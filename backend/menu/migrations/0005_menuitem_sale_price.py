@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-15 10:00
+
+import decimal
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0004_alter_basket_quantity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menuitem',
+            name='sale_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('price'), '*', django.db.models.expressions.CombinedExpression(models.Value(100), '-', models.F('discount'))), '*', models.Value(decimal.Decimal('0.01'))), output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+    ]
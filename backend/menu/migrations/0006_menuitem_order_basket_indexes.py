@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-15 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0005_menuitem_sale_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='basket',
+            index=models.Index(fields=['order', 'item'], name='menu_basket_order_i_dd441e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['archived', 'available', 'category'], name='menu_menuit_archive_98bc96_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'status'], name='menu_order_user_id_74cfaf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['user'], name='order_active_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.6 on 2026-10-15 20:07
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_duplicate_basket_rows(apps, schema_editor):
+    """
+    Collapse duplicate (order, item) basket rows into the oldest one, summing quantities,
+    so the unique constraint can be added.
+    """
+    Basket = apps.get_model('menu', 'Basket')
+    duplicates = (Basket.objects
+                  .values('order_id', 'item_id')
+                  .annotate(rows=Count('id'), total_quantity=Sum('quantity'))
+                  .filter(rows__gt=1))
+    for duplicate in duplicates:
+        rows = Basket.objects.filter(order_id=duplicate['order_id'], item_id=duplicate['item_id']).order_by('id')
+        keep = rows.first()
+        Basket.objects.filter(pk=keep.pk).update(quantity=duplicate['total_quantity'])
+        rows.exclude(pk=keep.pk).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0006_menuitem_order_basket_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='basket',
+            name='menu_basket_order_i_dd441e_idx',
+        ),
+        migrations.RunPython(merge_duplicate_basket_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='basket',
+            constraint=models.UniqueConstraint(fields=('order', 'item'), name='basket_order_item_unique'),
+        ),
+    ]
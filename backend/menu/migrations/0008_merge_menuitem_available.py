@@ -0,0 +1,14 @@
+# Generated by Django 5.0.6 on 2026-10-15 20:13
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0002_menuitem_available'),
+        ('menu', '0007_basket_order_item_unique'),
+    ]
+
+    operations = [
+    ]
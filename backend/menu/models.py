@@ -1,8 +1,10 @@
 from decimal import Decimal
+from urllib.parse import quote
 
+from django.core.cache import cache
 from django.db import models
 from django.core.validators import MaxValueValidator
-from django.db.models import Avg, Sum, F
+from django.db.models import Avg, Sum, F, Q, Value
 from django.utils import timezone
 from myauth.models import CustomUser
 
@@ -38,6 +40,52 @@ def category_preview_directory_path(instance: "Category", filename: str) -> str:
     )
 
 
+MENU_CACHE_VERSION_KEY = 'menu:v2:version'
+
+
+def menu_cache_key(category: str | None = None) -> str:
+    """
+    Build the cache key for the serialized menu list.
+    Args:
+        category (str | None): The category name the list is filtered by, if any.
+    Returns:
+        str: The cache key for the current menu version and category.
+    """
+    version = cache.get_or_set(MENU_CACHE_VERSION_KEY, 1, None)
+    return f'menu:v2:{version}:{quote(category or "all")}'
+
+
+def category_list_cache_key() -> str:
+    """
+    Build the cache key for the serialized category list.
+    Returns:
+        str: The cache key for the current menu version.
+    """
+    version = cache.get_or_set(MENU_CACHE_VERSION_KEY, 1, None)
+    return f'menu:v2:{version}:categories:list'
+
+
+def customer_cache_key(session_key: str) -> str:
+    """
+    Build the cache key for the id of the CustomUser bound to a session.
+    Args:
+        session_key (str): The session key of the anonymous visitor.
+    Returns:
+        str: The cache key for the session's customer id.
+    """
+    return f'cust:{session_key}'
+
+
+def invalidate_menu_cache() -> None:
+    """
+    Invalidate every cached menu list by bumping the menu cache version.
+    """
+    try:
+        cache.incr(MENU_CACHE_VERSION_KEY)
+    except ValueError:
+        pass
+
+
 class Category(models.Model):
     """
     Represents a category of dishes in the restaurant.
@@ -75,6 +123,7 @@ class MenuItem(models.Model):
         price (DecimalField): The price of the dish.
         category (ForeignKey): The category to which the dish belongs.
         discount (int): The discount on the dish (percentage).
+        sale_price (GeneratedField): The price after the percentage discount, computed by the database.
         archived (bool): Indicates whether the dish is archived.
         preview (ImageField): A preview image of the dish.
         available (bool): Indicates whether the dish is available.
@@ -85,11 +134,22 @@ class MenuItem(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, help_text='Dish price')
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     discount = models.SmallIntegerField(default=0)
+    sale_price = models.GeneratedField(
+        # Multiplying by 0.01 rather than dividing by 100 avoids integer division on SQLite.
+        expression=F('price') * (100 - F('discount')) * Value(Decimal('0.01')),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
     archived = models.BooleanField(default=False)
     preview = models.ImageField(null=True, blank=True, upload_to=product_preview_directory_path)
     available = models.BooleanField(default=True)
     tags = models.ManyToManyField(Tag, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['archived', 'available', 'category']),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -131,12 +191,20 @@ class Order(models.Model):
     status = models.CharField(max_length=10, choices=status_choice, default='active')
     payment_type = models.CharField(max_length=20, choices=payment)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'status']),
+            models.Index(fields=['user'], condition=Q(status='active'), name='order_active_idx'),
+        ]
+
     # address = models.TextField()
 
     def calculate_total_amount(self):
-        total_amount = self.items.aggregate(total=Sum(F('price') - F('discount') * F('basket__quantity'), output_field=models.DecimalField()))['total']
+        total_amount = self.basket_set.aggregate(
+            total=Sum(F('quantity') * F('sale_price'), output_field=models.DecimalField())
+        )['total'] or Decimal('0.00')
         self.total_amount = total_amount
-        return total_amount or Decimal('0.00')
+        return total_amount
 
 
 class Basket(models.Model):
@@ -145,3 +213,7 @@ class Basket(models.Model):
     quantity = models.PositiveIntegerField(default=1)
     sale_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['order', 'item'], name='basket_order_item_unique'),
+        ]
@@ -4,7 +4,6 @@ from .models import (MenuItem,
                      Category,
                      Basket,
                      Order,)
-from decimal import Decimal
 
 from myauth.serializers import UserSerializer
 
@@ -22,22 +21,37 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 class MenuItemSerializer(serializers.ModelSerializer):
-    category = serializers.SerializerMethodField()
-    tags = TagSerializer(many=True, read_only=True)
-
     class Meta:
         model = MenuItem
         fields = ['id',
                   'name',
                   'price',
                   'discount',
+                  'sale_price',
                   'preview',
                   'category',
                   'tags',
                   ]
+        read_only_fields = ['sale_price', 'category', 'tags']
 
-    def get_category(self, obj):
-        return obj.category.name
+    def to_representation(self, instance):
+        # Straight-line equivalent of the field-by-field ModelSerializer output.
+        preview = None
+        if instance.preview:
+            preview = instance.preview.url
+            request = self.context.get('request')
+            if request is not None:
+                preview = request.build_absolute_uri(preview)
+        return {
+            'id': instance.id,
+            'name': instance.name,
+            'price': '{:.2f}'.format(instance.price),
+            'discount': instance.discount,
+            'sale_price': '{:.2f}'.format(instance.sale_price),
+            'preview': preview,
+            'category': instance.category.name,
+            'tags': [{'id': tag.id, 'name': tag.name} for tag in instance.tags.all()],
+        }
 
 
 class MenuItemManagerSerializer(serializers.ModelSerializer):
@@ -60,62 +74,63 @@ class MenuItemManagerSerializer(serializers.ModelSerializer):
 
 
 class BasketItemSerializer(serializers.ModelSerializer):
-    item = MenuItemSerializer()
-    quantity = serializers.IntegerField(source='quantity')
+    """
+    Read-only representation of a basket row for the cart.
 
+    'price' is the sale price stored on the basket row when the item was added
+    (MenuItem.sale_price at that time), rendered as a string with two decimals.
+    """
     class Meta:
         model = Basket
         fields = ['item', 'quantity']
 
+    def get_item(self, instance):
+        # Reuse a MenuItem already loaded during this request (see RequestCacheMiddleware).
+        menu_items = getattr(self.context.get('request'), '_menu_items', None)
+        if menu_items is None:
+            return instance.item
+        item = menu_items.get(instance.item_id)
+        if item is None:
+            item = menu_items[instance.item_id] = instance.item
+        return item
+
     def to_representation(self, instance):
-        item_representation = MenuItemSerializer(instance.item).data
-        sale_price = instance.item.price * (1 - Decimal(instance.item.discount) / 100)
+        item = self.get_item(instance)
+        item_representation = MenuItemSerializer(item, context=self.context).data
         return {
             'id': item_representation['id'],
             'category': item_representation['category'],
-            'price': sale_price,
+            'price': '{:.2f}'.format(instance.sale_price),
             'count': instance.quantity,
-            'date': item_representation['date'],
-            'title': item_representation['title'],
-            'description': item_representation['description'],
-            'freeDelivery': item_representation['free_delivery'],
-            'images': item_representation['images'],
+            'title': item_representation['name'],
+            'description': item.description,
+            'images': item_representation['preview'],
             'tags': item_representation['tags'],
-            'reviews': item_representation['reviews'],
-            'rating': item_representation['rating'],
         }
 
 
 class OrderDetailSerializer(serializers.ModelSerializer):
-    customer = UserSerializer()
+    user = UserSerializer()
     products = BasketItemSerializer(many=True, read_only=True, source='basket_set')
-    deliveryType = serializers.SerializerMethodField()
     paymentType = serializers.CharField(source='payment_type')
     totalCost = serializers.DecimalField(max_digits=10, decimal_places=2, source='total_amount')
 
     class Meta:
         model = Order
-        fields = ['id', 'created_at', 'customer', 'deliveryType', 'paymentType',
-                  'status', 'city', 'address', 'products', 'totalCost']
-
-    def get_deliveryType(self, obj):
-        has_paid_delivery = any(item.free_delivery is False for item in obj.items.all())
-        return 'free' if not has_paid_delivery else 'paid'
+        fields = ['id', 'created_at', 'user', 'paymentType',
+                  'status', 'products', 'totalCost']
 
     def to_representation(self, instance):
         formatted_data = {
             'id': instance.id,
             'createdAt': instance.created_at.strftime('%Y-%m-%d %H:%M'),
-            'fullName': instance.customer.get_fullName(),
-            'email': instance.customer.email,
-            'phone': instance.customer.phone,
-            'deliveryType': self.get_deliveryType(instance),
+            'fullName': instance.user.get_fullName(),
+            'email': instance.user.email,
+            'phone': instance.user.phone,
             'paymentType': instance.payment_type,
             'totalCost': instance.total_amount,
             'status': instance.status,
-            'city': instance.city,
-            'address': instance.address,
-            'products': BasketItemSerializer(instance.basket_set.all(), many=True).data,
+            'products': BasketItemSerializer(instance.basket_set.all(), many=True, context=self.context).data,
         }
 
-        return formatted_data
\ No newline at end of file
+        return formatted_data
@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from myauth.models import CustomUser
+
+from .models import Category, MenuItem, Tag, customer_cache_key, invalidate_menu_cache
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=MenuItem.tags.through)
+@receiver(post_delete, sender=MenuItem.tags.through)
+def menu_changed(sender, **kwargs):
+    """
+    Invalidate cached menu lists whenever a menu item, category, tag or tag assignment changes.
+    The version is bumped once the write commits, so a concurrent read cannot cache the old rows under the new version.
+    """
+    transaction.on_commit(invalidate_menu_cache)
+
+
+@receiver(m2m_changed, sender=MenuItem.tags.through)
+def menu_item_tags_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(invalidate_menu_cache)
+
+
+@receiver(post_delete, sender=CustomUser)
+def customer_deleted(sender, instance, **kwargs):
+    """
+    Drop the cached session lookup of a deleted customer so baskets are not created for a dangling id.
+    """
+    if instance.session_key:
+        cache_key = customer_cache_key(instance.session_key)
+        transaction.on_commit(lambda: cache.delete(cache_key))
@@ -1,3 +1,91 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.models import QuerySet
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from myauth.models import CustomUser
+from menu.models import Basket, Category, MenuItem, Order
+
+
+class BasketAPIViewPostTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='basket_user', password='password')
+        self.item = MenuItem.objects.create(
+            name='Pandan bubble waffle',
+            price='20.00',
+            discount=10,
+            category=Category.objects.create(name='Dessert'),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_to_basket(self, count):
+        return self.client.post(reverse('api:basket'), {'id': self.item.id, 'count': count}, format='json')
+
+    def test_post_inserts_basket_row(self):
+        response = self.add_to_basket(2)
+
+        self.assertEqual(response.status_code, 201)
+        basket_item = Basket.objects.get(order__user=self.user, item=self.item)
+        self.assertEqual(basket_item.quantity, 2)
+        self.assertEqual(str(basket_item.sale_price), '18.00')
+        self.assertEqual(response.data['count'], 2)
+
+    def test_post_increments_existing_row(self):
+        self.add_to_basket(2)
+        response = self.add_to_basket(3)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Basket.objects.filter(order__user=self.user, item=self.item).count(), 1)
+        self.assertEqual(Basket.objects.get(order__user=self.user, item=self.item).quantity, 5)
+        self.assertEqual(response.data['count'], 5)
+
+    def test_post_retries_increment_when_concurrent_insert_wins(self):
+        order = Order.objects.create(user=self.user, total_amount=0)
+        update = QuerySet.update
+
+        def racing_update(queryset, **kwargs):
+            # Another request inserts the row between our UPDATE and INSERT.
+            if queryset.model is Basket and not Basket.objects.exists():
+                Basket.objects.create(order=order, item=self.item, quantity=4, sale_price='18.00')
+                return 0
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', autospec=True, side_effect=racing_update):
+            response = self.add_to_basket(3)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Basket.objects.filter(order=order, item=self.item).count(), 1)
+        self.assertEqual(Basket.objects.get(order=order, item=self.item).quantity, 7)
+        self.assertEqual(response.data['count'], 7)
+
+
+class MenuListViewCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.item = MenuItem.objects.create(
+            name='Mango sticky rice',
+            price='12.00',
+            category=Category.objects.create(name='Dessert'),
+        )
+        self.client = APIClient()
+
+    def test_item_edit_refreshes_cached_menu_and_etag(self):
+        response = self.client.get(reverse('api:menu_api'))
+        etag = response['ETag']
+        self.assertEqual(response.data['items'][0]['price'], '12.00')
+        not_modified = self.client.get(reverse('api:menu_api'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.item.price = '14.00'
+            self.item.save()
 
-# Create your tests here.
+        response = self.client.get(reverse('api:menu_api'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['items'][0]['price'], '14.00')
+        self.assertNotEqual(response['ETag'], etag)
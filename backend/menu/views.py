@@ -1,17 +1,37 @@
+import hashlib
+
 from rest_framework import status
 from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from .models import (MenuItem,
                      Category,
                      Tag,
                      Order,
-                     Basket)
+                     Basket,
+                     category_list_cache_key,
+                     customer_cache_key,
+                     invalidate_menu_cache,
+                     menu_cache_key)
 from rest_framework.views import APIView
 from .serializers import MenuItemSerializer, TagSerializer, BasketItemSerializer, OrderDetailSerializer, CategorySerializer, MenuItemManagerSerializer
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F, Prefetch
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from gico.renderers import ORJSONRenderer
 from myauth.models import CustomUser
 
 
+def payload_etag(data) -> str:
+    """
+    Build a weak ETag from the JSON encoding of a response payload.
+    """
+    return 'W/"{}"'.format(hashlib.md5(ORJSONRenderer().render(data), usedforsecurity=False).hexdigest())
+
+
 class TagView(APIView):
     """
     API View to retrieve all tags.
@@ -35,22 +55,63 @@ class MenuListView(ListAPIView):
 
     Methods:
     - list: Retrieve all menu items, optionally filtered by category.
+
+    The list is built from a values() projection rather than MenuItemSerializer;
+    each row has the same shape the serializer produces.
     """
+    queryset = MenuItem.objects.filter(archived=False, available=True)
     serializer_class = MenuItemSerializer
+    list_fields = ('id', 'name', 'price', 'discount', 'sale_price', 'preview', 'category__name')
     # filter_backends = [DjangoFilterBackend, OrderingFilter]
 
     def list(self, request, *args, **kwargs):
         category = request.data.get("category", None)
-        queryset = MenuItem.objects.filter(archived=False, available=True)
-        if category:
-            category_instance = Category.objects.get(name=category)
-            queryset = queryset.filter(category=category_instance)
 
-        serialized_items = self.get_serializer(queryset, many=True).data
+        def build():
+            queryset = self.get_queryset()
+            if category:
+                queryset = queryset.filter(category__name=category)
+            items = list(queryset.values(*self.list_fields))
+
+            tags = {}
+            item_tags = (MenuItem.tags.through.objects
+                         .filter(menuitem_id__in=[item['id'] for item in items])
+                         .values_list('menuitem_id', 'tag_id', 'tag__name'))
+            for item_id, tag_id, tag_name in item_tags:
+                tags.setdefault(item_id, []).append({'id': tag_id, 'name': tag_name})
+
+            data = {
+                'items': [self.item_representation(item, tags.get(item['id'], [])) for item in items],
+            }
+            return data, payload_etag(data)
+
+        data, etag = cache.get_or_set(menu_cache_key(category), build, 300)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+
+        # Cached previews are relative so the payload does not depend on the requesting host.
         data = {
-            'items': serialized_items,
+            'items': [
+                dict(item, preview=request.build_absolute_uri(item['preview'])) if item['preview'] else item
+                for item in data['items']
+            ],
+        }
+        return Response(data, status=status.HTTP_200_OK, headers={'ETag': etag})
+
+    def item_representation(self, item, tags):
+        preview = item['preview']
+        return {
+            'id': item['id'],
+            'name': item['name'],
+            'price': str(item['price']),
+            'discount': item['discount'],
+            'sale_price': str(item['sale_price']),
+            'preview': default_storage.url(preview) if preview else None,
+            'category': item['category__name'],
+            'tags': tags,
         }
-        return Response(data, status=status.HTTP_200_OK)
 
 
 class MenuItemDetailView(RetrieveAPIView):
@@ -86,69 +147,108 @@ class BasketAPIView(APIView):
     """
     serializer_class = BasketItemSerializer
 
-    def get(self, request, *args, **kwargs):
+    def _get_customer(self, request, create=False):
+        """
+        Resolve the id of the customer owning the basket: the authenticated user or
+        the CustomUser bound to the current session. The session lookup is cached
+        between requests; misses are never cached, and the entry is dropped when the
+        CustomUser is deleted. Returns None for an anonymous visitor without a stored
+        customer unless create is set.
+        """
         if request.user.is_authenticated:
-            customer_identifier = request.user.id
-        else:
+            return request.user.id
+        session_key = request.session.session_key
+        if not session_key and create:
+            request.session.save()
             session_key = request.session.session_key
-            custom_user = CustomUser.objects.filter(session_key=session_key).first()
-            customer_identifier = custom_user.id
-        order = Order.objects.filter(customer=customer_identifier, status='active').first()
-        basket_items = Basket.objects.filter(order=order)
-        serializer = self.serializer_class(basket_items, many=True)
+        if not session_key:
+            return None
+        cache_key = customer_cache_key(session_key)
+        customer_id = cache.get(cache_key)
+        if customer_id is None:
+            if create:
+                customer_id = CustomUser.objects.get_or_create(session_key=session_key)[0].id
+            else:
+                customer_id = (CustomUser.objects
+                               .filter(session_key=session_key)
+                               .values_list('id', flat=True)
+                               .first())
+            if customer_id is not None:
+                cache.set(cache_key, customer_id, 300)
+        return customer_id
+
+    def get(self, request, *args, **kwargs):
+        customer_identifier = self._get_customer(request)
+        if customer_identifier is None:
+            return Response([], status=status.HTTP_200_OK)
+        basket_items = (Basket.objects
+                        .filter(order__user=customer_identifier, order__status='active')
+                        .select_related('item', 'item__category')
+                        .prefetch_related('item__tags'))
+        serializer = self.serializer_class(basket_items, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request, *args, **kwargs):
-        item = MenuItem.objects.get(pk=request.data.get('id', 0))
         count = int(request.data.get('count', 0))
-        if request.user.is_authenticated:
-            customer_identifier = request.user
-        else:
-            session_key = request.session.session_key
-            if not session_key:
-                request.session.save()
-                session_key = request.session.session_key
-            customer_identifier, created = CustomUser.objects.get_or_create(session_key=session_key)
-
-        order, created = Order.objects.get_or_create(customer=customer_identifier, status='active', total_amount=0)
-        order_list, created = Basket.objects.get_or_create(order=order, item=item)
-        sale_price = item.price - item.discount
-        order_list.sale_price = sale_price
-        order_list.quantity += count
-        order_list.save()
-
-        serializer = self.serializer_class(order_list, many=False)
+        customer_identifier = self._get_customer(request, create=True)
+
+        with transaction.atomic():
+            item = MenuItem.objects.get(pk=request.data.get('id', 0))
+            # Lets BasketItemSerializer reuse this item instead of loading basket.item again.
+            menu_items = getattr(request, '_menu_items', None)
+            if menu_items is not None:
+                menu_items[item.pk] = item
+            sale_price = item.sale_price
+            order, created = Order.objects.get_or_create(
+                user_id=customer_identifier,
+                status='active',
+                defaults={'total_amount': 0},
+            )
+            basket_items = Basket.objects.filter(order=order, item=item)
+            order_list = None
+            if not basket_items.update(quantity=F('quantity') + count, sale_price=sale_price):
+                try:
+                    with transaction.atomic():
+                        order_list = Basket.objects.create(order=order, item=item, quantity=count, sale_price=sale_price)
+                except IntegrityError:
+                    # The same item was added by a concurrent request.
+                    basket_items.update(quantity=F('quantity') + count, sale_price=sale_price)
+            if order_list is None:
+                order_list = basket_items.get()
+
+        serializer = self.serializer_class(order_list, many=False, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def delete(self, request, *args, **kwargs):
         data = request.data
         item_id = data['id']
         count = data['count']
-        if request.user.is_authenticated:
-            customer_identifier = request.user
-        else:
-            session_key = request.session.session_key
-            if not session_key:
-                request.session.save()
-                session_key = request.session.session_key
-            customer_identifier, created = CustomUser.objects.get_or_create(session_key=session_key)
-
-        order = Order.objects.filter(customer=customer_identifier, status='active').first()
-        basket_item = Basket.objects.filter(order=order, item_id=item_id).first()
-        if count < basket_item.quantity:
-            basket_item.quantity -= count
-            basket_item.save()
-        else:
-            basket_item.delete()
-            remaining_items = Basket.objects.filter(order=order).exists()
-            if not remaining_items:
-                order.delete()
-                serializer = BasketItemSerializer([], many=True)
-                return Response(serializer.data, status=status.HTTP_200_OK)
-
-        updated_basket_items = Basket.objects.filter(order=order)
-
-        serializer = BasketItemSerializer(updated_basket_items, many=True)
+        customer_identifier = self._get_customer(request)
+        if customer_identifier is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        with transaction.atomic():
+            basket_item = (Basket.objects
+                           .select_for_update(of=('self',))
+                           .filter(order__user=customer_identifier, order__status='active', item_id=item_id)
+                           .first())
+            if basket_item is None:
+                return Response(status=status.HTTP_404_NOT_FOUND)
+            order_id = basket_item.order_id
+            if count < basket_item.quantity:
+                basket_item.quantity -= count
+                basket_item.save(update_fields=['quantity'])
+            else:
+                basket_item.delete()
+
+            updated_basket_items = list(Basket.objects
+                                        .filter(order_id=order_id)
+                                        .select_related('item', 'item__category')
+                                        .prefetch_related('item__tags'))
+            if not updated_basket_items:
+                Order.objects.filter(pk=order_id).delete()
+
+        serializer = BasketItemSerializer(updated_basket_items, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -162,17 +262,22 @@ class OrderAPIView(APIView):
     """
     def get(self, request, *args, **kwargs):
         customer_identifier = request.user.id
-        orders = Order.objects.filter(customer=customer_identifier)
-        serializer = OrderDetailSerializer(orders, many=True)
+        orders = (Order.objects
+                  .filter(user=customer_identifier)
+                  .select_related('user')
+                  .prefetch_related(
+                      Prefetch('basket_set', queryset=Basket.objects.select_related('item', 'item__category')),
+                      'basket_set__item__tags',
+                  ))
+        serializer = OrderDetailSerializer(orders, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request, *args, **kwargs):
         customer_identifier = request.user.id
-        order = Order.objects.filter(customer=customer_identifier, status='active').first()
+        order = Order.objects.filter(user=customer_identifier, status='active').first()
         if order:
-            order.total_amount = order.calculate_total_amount()
-            order.status = 'pending'
-            order.save()
+            total_amount = order.calculate_total_amount()
+            Order.objects.filter(pk=order.pk).update(total_amount=total_amount, status='pending')
             response_data = {'orderId': order.id}
             return Response(response_data, status=status.HTTP_200_OK)
         return Response(status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -197,22 +302,20 @@ class OrderDetailAPIView(RetrieveAPIView):
 
     def get(self, request, *args, **kwargs):
         order = get_object_or_404(self.queryset, id=kwargs[self.lookup_field])
-        serializer = self.serializer_class(order)
+        serializer = self.serializer_class(order, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request, *args, **kwargs):
-        order = get_object_or_404(self.queryset, id=kwargs[self.lookup_field])
+        order = get_object_or_404(self.queryset.only('id', 'user'), id=kwargs[self.lookup_field])
         data = request.data
-        order.customer.update_name(data.get('fullName', order.customer.get_fullName()))
-        order.payment_type = data.get('paymentType', order.payment_type)
-        order.city = data.get('city', order.city)
-        order.address = data.get('address', order.address)
-        order.delivery_type = data.get('deliveryType', order.delivery_type)
-        total_amount = order.total_amount
-        order.total_amount = total_amount
-        order.status = 'payment'
-        order.save()
-        print(order.payment_type)
+        if 'fullName' in data:
+            first_name, last_name = CustomUser.split_full_name(data['fullName'])
+            CustomUser.objects.filter(pk=order.user_id).update(first_name=first_name, last_name=last_name)
+
+        fields = {'status': 'payment'}
+        if 'paymentType' in data:
+            fields['payment_type'] = data['paymentType']
+        Order.objects.filter(pk=order.pk).update(**fields)
 
         return Response({'orderId': order.id})
 
@@ -226,9 +329,17 @@ class CategoryApiView(APIView):
         Handles GET requests and returns a list of all categories in JSON format.
     """
     def get(self, request, *args, **kwargs):
-        categories = Category.objects.all()
-        serializer = CategorySerializer(categories, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        def build():
+            categories = Category.objects.only('id', 'name')
+            data = CategorySerializer(categories, many=True).data
+            return data, payload_etag(data)
+
+        data, etag = cache.get_or_set(category_list_cache_key(), build, 300)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+        return Response(data, status=status.HTTP_200_OK, headers={'ETag': etag})
 
 
 class ItemView(APIView):
@@ -245,7 +356,11 @@ class ItemView(APIView):
 
     delete(request, *args, **kwargs):
         Handles DELETE requests to archive a menu item based on its ID.
+
+    All methods are restricted to staff users.
     """
+    permission_classes = [IsAdminUser]
+
     def post(self, request):
         """
         Creates a new menu item.
@@ -284,16 +399,18 @@ class ItemView(APIView):
             A JSON response containing the updated menu item data and a status code 200 if successful,
             or a 404 status if the menu item is not found, or validation errors and a status code 400 if not.
         """
-        if not request.user.is_staff:
-            return Response(status=status.HTTP_403_FORBIDDEN)
-        try:
-            item = MenuItem.objects.get(pk=pk)
-        except MenuItem.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        item = get_object_or_404(
+            MenuItem.objects.select_related('category').only(
+                'id', 'name', 'price', 'discount', 'sale_price', 'preview', 'category__name',
+            ),
+            pk=pk,
+        )
 
         serializer = MenuItemSerializer(item, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            # sale_price is computed by the database and is not refreshed by save().
+            item.refresh_from_db(fields=['sale_price'])
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -311,16 +428,12 @@ class ItemView(APIView):
         Response
             A status code 204 if the operation is successful, or 404 if the menu item is not found.
         """
-        if not request.user.is_staff:
-            return Response(status=status.HTTP_403_FORBIDDEN)
         data = request.data
         item_id = data['id']
-        try:
-            item = MenuItem.objects.get(id=item_id)
-        except MenuItem.DoesNotExist:
+        updated = MenuItem.objects.filter(id=item_id).update(archived=True)
+        if not updated:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-        item.archived = True
-        item.save()
+        invalidate_menu_cache()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -25,12 +25,14 @@ class CustomUser(AbstractUser):
     )
     phone = models.CharField(max_length=15, null=True, blank=True)
     avatar = models.ImageField(upload_to=avatar_directory_path, null=True, blank=True)
-    session_key = models.CharField(max_length=40, blank=True, null=True)
+    session_key = models.CharField(max_length=40, blank=True, null=True, db_index=True)
 
     def get_fullName(self):
         return f"{self.first_name} {self.last_name}"
 
-    def update_name(self, full_name):
+    @staticmethod
+    def split_full_name(full_name):
         full_name_parts = full_name.split()
-        self.first_name = full_name_parts[0] if full_name_parts else ''
-        self.last_name = ' '.join(full_name_parts[1:]) if len(full_name_parts) > 1 else ''
+        first_name = full_name_parts[0] if full_name_parts else ''
+        last_name = ' '.join(full_name_parts[1:]) if len(full_name_parts) > 1 else ''
+        return first_name, last_name